@@ -21,8 +21,37 @@ MSYS2_PATHS = [
 ]
 
 # ARM GCC 工具链安装目录
+# 各版本并存于 <安装目录>\arm-none-eabi-gcc\<版本>，PATH 固定指向 arm-none-eabi-gcc\current\bin，
+# current 是指向正在使用的版本的目录联接，切换版本时只修改联接
 ARM_GCC_INSTALL_DIR = r'D:\\CodeTools\\Compiler'
 
+# ARM GCC 边下载边解压：不在临时目录保存完整压缩包，总耗时约为下载与解压中较长的一项
+# 失败时自动改为先下载完整压缩包再解压
+ARM_GCC_STREAMING_INSTALL = True
+
+# ARM GCC 按需安装：只通过 Range 请求下载压缩包中需要的文件（不下载文档和用不到的多库变体）
+# 服务器不支持 Range 或按需安装失败时自动改为下载完整压缩包
+ARM_GCC_SELECTIVE_INSTALL = False
+
+# 按需安装的排除规则（通配符，匹配压缩包内路径）
+ARM_GCC_EXCLUDE_PATTERNS = [
+    '*/share/doc/*',
+    '*/share/info/*',
+    '*/share/man/*',
+    '*/arm-none-eabi/lib/thumb/*',
+    '*/arm-none-eabi/lib/arm/*',
+    '*/lib/gcc/arm-none-eabi/*/thumb/*',
+    '*/lib/gcc/arm-none-eabi/*/arm/*',
+    '*/arm-none-eabi/include/c++/*/arm-none-eabi/thumb/*',
+    '*/arm-none-eabi/include/c++/*/arm-none-eabi/arm/*',
+]
+
+# 按需安装的包含规则，优先于排除规则
+# 默认保留 Cortex-M4F（STM32F4，-mfloat-abi=hard/softfp）使用的多库
+ARM_GCC_INCLUDE_PATTERNS = [
+    '*/thumb/v7e-m+fp/*',
+]
+
 # ==================== 镜像源配置 ====================
 
 # 默认使用的镜像源
@@ -32,11 +61,13 @@ DEFAULT_MIRROR = 'tsinghua'
 # 清华大学镜像源
 TSINGHUA_MIRROR = {
     'msys2': 'https://mirrors.tuna.tsinghua.edu.cn/msys2/mingw/x86_64',
+    'msys2_distrib': 'https://mirrors.tuna.tsinghua.edu.cn/msys2/distrib',
 }
 
 # 中国科学技术大学镜像源
 USTC_MIRROR = {
     'msys2': 'https://mirrors.ustc.edu.cn/msys2/mingw/x86_64',
+    'msys2_distrib': 'https://mirrors.ustc.edu.cn/msys2/distrib',
 }
 
 # ==================== 下载配置 ====================
@@ -47,6 +78,123 @@ DOWNLOAD_TIMEOUT = 300
 # 是否显示下载进度
 SHOW_DOWNLOAD_PROGRESS = True
 
+# 分段下载的并发连接数（服务器不支持 Range 时自动回退为单连接）
+DOWNLOAD_CONNECTIONS = 4
+
+# 每个分段的最小大小（MB），文件太小时不拆分
+DOWNLOAD_MIN_SEGMENT_MB = 4
+
+# 边下载边校验 SHA-256 时，暂存其他分段先到数据的内存上限（MB）
+# SHA-256 只能按顺序计算，前面的分段较慢时，后面分段的数据先暂存在内存中，补齐后直接计算；
+# 超出上限的部分下载完成后从文件读回计算（多一次磁盘读取）。调大可减少读回，但占用更多内存；0 表示不暂存
+DOWNLOAD_HASH_BUFFER_MB = 128
+
+# 解压 zip 使用的线程数，None 表示按 CPU 核心数（最多 8 个）
+EXTRACT_WORKERS = None
+
+# ==================== 多源下载配置 ====================
+
+# 探测各下载源的超时时间（秒），超时的源不参与本次下载
+MIRROR_PROBE_TIMEOUT = 5
+
+# 下载速度持续低于此值（KB/s）时切换到其他源（仅在有多个可用源时生效）
+MIRROR_MIN_SPEED_KB = 64
+
+# 判定速度过低的统计窗口（秒）
+MIRROR_SLOW_WINDOW_SEC = 10
+
+# ARM GCC 工具链的镜像地址（目录结构需与官方一致: <镜像>/<版本>/binrel/<文件名>）
+# 例如: ['https://mirror.example.com/arm-gnu-toolchain']
+ARM_GCC_MIRRORS = []
+
+# ==================== 重试与熔断配置 ====================
+
+# 网络请求与 winget 下载遇到暂时性错误时的最多尝试次数（含第一次）
+RETRY_ATTEMPTS = 3
+
+# 重试的初始等待时间与最长等待时间（秒），每次失败后翻倍并加入随机抖动
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 30
+
+# 同一主机连续失败多少次后暂时跳过该主机（经代理时连不上代理记在代理名下）
+CIRCUIT_FAILURE_THRESHOLD = 3
+
+# 跳过主机的时长（秒），到期后重新尝试
+CIRCUIT_RESET_SEC = 300
+
+# ==================== 代理配置 ====================
+
+# 代理地址（如 'http://127.0.0.1:7890'），None 表示读取系统代理设置
+PROXY_URL = None
+
+# 按主机的路由规则，按顺序匹配主机名（支持通配符 *）
+# 可选值: 'direct' (直连), 'proxy' (使用代理), 'auto' (自动测速选择更快的路由),
+#         'system' (遵循系统代理设置), 或具体的代理地址
+PROXY_RULES = [
+    ('*.edu.cn', 'direct'),  # 清华、中科大镜像直连最快
+    ('api.github.com', 'proxy'),
+    ('developer.arm.com', 'proxy'),
+]
+
+# 未匹配任何规则的主机使用的路由
+PROXY_DEFAULT_ROUTE = 'system'
+
+# 'auto' 路由测速结果的有效期（小时）
+PROXY_PROBE_TTL_HOURS = 24
+
+# ==================== 下载缓存配置 ====================
+
+# 是否启用下载缓存（重新安装/修复时直接复用已下载的安装包）
+ARTIFACT_CACHE_ENABLED = True
+
+# 缓存目录，None 表示使用 <安装根目录>\.cache\artifacts
+ARTIFACT_CACHE_DIR = None
+
+# 缓存容量上限（MB），超出后按最近最少使用（LRU）淘汰
+ARTIFACT_CACHE_MAX_MB = 4096
+
+# 缓存有效期（小时），在有效期内直接使用缓存；过期后向服务器校验 ETag/Last-Modified
+ARTIFACT_CACHE_TTL_HOURS = 24
+
+# 选择工具后是否立即在后台预取安装文件（在用户回答提示期间下载，需启用下载缓存）
+PREFETCH_ENABLED = True
+
+# ==================== 局域网缓存共享配置 ====================
+
+# 是否启用局域网缓存共享：下载前先向局域网中已下载过该文件的电脑获取（批量装机时只需一台从外网下载）
+# 也可以在一台电脑上运行 `python install.py --serve-cache` 作为专门的缓存服务器
+LAN_PEER_ENABLED = False
+
+# 启用后本机运行期间是否同时共享自己的下载缓存
+LAN_PEER_SERVE = True
+
+# 查询对端使用的 UDP 端口（局域网内所有电脑需一致，并在防火墙中放行）
+LAN_PEER_PORT = 18730
+
+# 共享文件的 HTTP 端口，0 表示自动分配（通过 UDP 应答告知对端）
+LAN_PEER_HTTP_PORT = 0
+
+# 查询的广播地址，也可以是地址列表（如只在部分网段查询、或单机测试时用 '127.0.0.1'，
+# 此时会同时发送本机回环广播，本机上监听该端口的所有进程都能收到）
+LAN_PEER_BROADCAST = '255.255.255.255'
+
+# 等待对端应答的时间（秒），超时后直接从互联网下载
+LAN_PEER_DISCOVERY_TIMEOUT = 1
+
+# 共享服务监听的地址，'' 表示所有网卡：同一网络中的任何主机都能读取本机下载缓存中的文件
+# 只想在某个网卡（如装机用的有线网）上共享时填写该网卡的 IP 地址
+# 只有提供了可信 SHA-256 的文件才会向对端获取，没有校验值的文件（如 MSYS2 安装程序）总是从互联网下载
+LAN_PEER_BIND_ADDRESS = ''
+
+# ==================== GitHub API 配置 ====================
+
+# GitHub Release 信息的缓存有效期（小时），有效期内不联网；过期后用 ETag 条件请求校验
+GITHUB_METADATA_TTL_HOURS = 6
+
+# GitHub 访问令牌（可选），未认证时每小时仅 60 次请求
+# None 表示读取环境变量 GITHUB_TOKEN 或 GH_TOKEN
+GITHUB_TOKEN = None
+
 # ==================== 其他配置 ====================
 
 # 是否自动生成配置文件
@@ -56,8 +204,8 @@ AUTO_GENERATE_CONFIG = True
 # None 表示使用系统临时目录
 CONFIG_FILE_PATH = None
 
-# 是否在安装前检查磁盘空间
+# 是否在安装前检查磁盘空间（按压缩包中央目录或安装程序大小计算所需空间，见 DiskSpaceUtils）
 CHECK_DISK_SPACE = True
 
-# 最小所需磁盘空间（MB）
+# 除安装所需空间外，每个卷至少还要保留的空间（MB）
 MIN_DISK_SPACE_MB = 1024
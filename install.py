@@ -167,8 +167,12 @@ def ensure_admin_on_windows():
     return False
 
 
-def main():
-    """主函数"""
+def main(bundle_path=None):
+    """主函数
+
+    Args:
+        bundle_path: 离线安装包路径（--from-bundle），指定时本次运行不访问网络
+    """
     # 检查环境
     if not check_environment():
         return False
@@ -178,7 +182,7 @@ def main():
     # 导入工具类
     from tools.base import CmdTask, FileUtils, PrintUtils, ChooseTask, ChooseWithCategoriesTask, ConfigUtils
     from tools.base import osversion, osarch
-    from tools.base import run_tool_file
+    from tools.base import run_tool_file, PeerCacheUtils, BundleUtils, TrashUtils
 
     # 打印欢迎信息
     tip = """
@@ -269,6 +273,16 @@ def main():
     if not ConfigUtils.persist_install_base_path(selected_base_path):
         PrintUtils.print_warning("安装目录写入配置失败，将继续使用当前运行时配置")
 
+    # 在后台继续删除上次卸载时没删完（程序已退出或文件被占用）的内容
+    TrashUtils.purge()
+
+    # 使用离线安装包时从安装包读取所有文件；否则启用局域网缓存共享时共享本机的下载缓存
+    if bundle_path:
+        if not BundleUtils.load(bundle_path):
+            return False
+    else:
+        PeerCacheUtils.start_server()
+
     # 循环选择工具：运行完成后返回主菜单，直到用户选择 0 退出
     while True:
         code, result = ChooseWithCategoriesTask(
@@ -300,13 +314,52 @@ def main():
     PrintUtils.print_delay(end_tip, 0.001)
 
 
+def build_bundle(output_path):
+    """生成离线安装包（python install.py bundle [输出路径]）"""
+    _ensure_persistent_config_on_windows()
+    import importlib
+    from tools.base import BundleUtils
+
+    tool_objects = []
+    for tool_id in sorted(tools):
+        module = importlib.import_module(tools[tool_id]['tool'].replace('/', '.').replace('.py', ''))
+        tool_objects.append(module.Tool())
+    return BundleUtils.build(tool_objects, output_path)
+
+
+def serve_cache():
+    """作为局域网缓存服务器运行（python install.py --serve-cache），不需要管理员权限"""
+    _ensure_persistent_config_on_windows()
+    from tools.base import PeerCacheUtils
+    PeerCacheUtils.serve_forever()
+
+
 if __name__ == '__main__':
     run_exc = []
 
+    if '--serve-cache' in sys.argv[1:]:
+        serve_cache()
+        sys.exit(0)
+
+    if sys.argv[1:2] == ['bundle']:
+        import time
+        output = sys.argv[2] if len(sys.argv) > 2 else f"install-bundle-{time.strftime('%Y%m%d')}.zip"
+        sys.exit(0 if build_bundle(output) else 1)
+
+    bundle_path = None
+    if '--from-bundle' in sys.argv[1:]:
+        index = sys.argv.index('--from-bundle')
+        if index + 1 >= len(sys.argv):
+            print("用法: install.py --from-bundle <离线安装包路径>")
+            sys.exit(1)
+        # 提权重启后工作目录可能改变，先转换为绝对路径
+        bundle_path = os.path.abspath(sys.argv[index + 1])
+        sys.argv[index + 1] = bundle_path
+
     try:
         if not ensure_admin_on_windows():
             sys.exit(0)
-        main()
+        main(bundle_path)
     except KeyboardInterrupt:
         print("\n\n用户取消操作")
     except Exception as e:
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""test_peer_cache 启动的子进程：各自使用独立的安装根目录与下载缓存，在回环地址上共享缓存
+
+用法:
+    peer_process.py serve <工作目录> <UDP 端口> <缓存键> <文件> <SHA-256>
+        把文件按给定 SHA-256 加入缓存（不校验，用于模拟内容被篡改的对端），作为缓存服务器运行，
+        就绪后输出 ready，标准输入关闭时退出
+    peer_process.py fetch <工作目录> <UDP 端口> <下载地址> <SHA-256> <保存路径>
+        同时启动本机的共享服务（与默认流程一致），查询对端并下载，结果以 JSON 输出
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from tools import base
+
+
+def _setup(work_dir, port):
+    config.ARTIFACT_CACHE_DIR = os.path.join(work_dir, 'cache')
+    config.SHOW_DOWNLOAD_PROGRESS = False
+    config.LAN_PEER_ENABLED = True
+    config.LAN_PEER_SERVE = True
+    config.LAN_PEER_PORT = port
+    config.LAN_PEER_BROADCAST = '127.0.0.1'
+    config.LAN_PEER_DISCOVERY_TIMEOUT = 2
+    base.WINGET_INSTALL_PATH = os.path.join(work_dir, 'root')
+    # 输出只留给 JSON 结果
+    base.PrintUtils.set_thread_muted(True)
+
+
+def serve(work_dir, port, url, file_path, sha256):
+    _setup(work_dir, int(port))
+    base.CacheUtils.store(url, file_path, sha256=sha256)
+    if not base.PeerCacheUtils.start_server():
+        sys.exit(1)
+    print('ready', flush=True)
+    sys.stdin.read()
+    base.PeerCacheUtils.stop_server()
+
+
+def fetch(work_dir, port, url, sha256, save_path):
+    _setup(work_dir, int(port))
+    serving = base.PeerCacheUtils.start_server()
+    result = {
+        'serving': serving,
+        'peer_without_digest': base.PeerCacheUtils.find(url),
+        'peer': base.PeerCacheUtils.find(url, sha256),
+        'downloaded': base.FileUtils.download(url, save_path, show_progress=False, sha256=sha256),
+    }
+    base.PeerCacheUtils.stop_server()
+    print(json.dumps(result), flush=True)
+
+
+if __name__ == '__main__':
+    {'serve': serve, 'fetch': fetch}[sys.argv[1]](*sys.argv[2:])
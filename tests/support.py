@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""测试公用：本地 HTTP 下载源与隔离的安装根目录"""
+import os
+import re
+import sys
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from tools import base
+
+
+class LocalServer:
+    """在 127.0.0.1 的随机端口上提供一个文件，支持 Range
+
+    Args:
+        files: {路径: 内容}，如 {'/a.zip': b'...'}
+        latency: 每个请求响应前的等待时间（秒）
+        drop_after: 每个响应最多发送的字节数，之后直接断开连接（None 表示不断开）
+    """
+
+    def __init__(self, files, latency=0, drop_after=None):
+        self.files = files
+        self.latency = latency
+        self.drop_after = drop_after
+        # 收到的请求：(路径, Range 头)
+        self.requests = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.port}{path}'
+
+    def range_starts(self, path):
+        """返回对 path 的区间请求的起始偏移"""
+        with self._lock:
+            return [int(re.match(r'bytes=(\d+)-', r).group(1)) for p, r in self.requests if p == path and r]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handle(self, handler):
+        with self._lock:
+            self.requests.append((handler.path, handler.headers.get('Range')))
+        if self.latency:
+            time.sleep(self.latency)
+        data = self.files.get(handler.path)
+        if data is None:
+            handler.send_response(404)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+            return
+
+        start, end = 0, len(data) - 1
+        match = re.match(r'bytes=(\d+)-(\d*)', handler.headers.get('Range') or '')
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)) if match.group(2) else end, end)
+            handler.send_response(206)
+            handler.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        else:
+            handler.send_response(200)
+        handler.send_header('Accept-Ranges', 'bytes')
+        handler.send_header('ETag', '"v1"')
+        handler.send_header('Content-Length', str(end - start + 1))
+        handler.end_headers()
+
+        body = data[start:end + 1]
+        if self.drop_after is not None and len(body) > self.drop_after:
+            handler.wfile.write(body[:self.drop_after])
+            handler.wfile.flush()
+            handler.close_connection = True
+            handler.connection.shutdown(2)
+            return
+        handler.wfile.write(body)
+
+
+class IsolatedTestCase(unittest.TestCase):
+    """把安装根目录、下载缓存与主机熔断状态隔离到临时目录"""
+
+    # 各用例额外覆盖的配置项
+    CONFIG = {}
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix='install-test-')
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        values = {
+            'ARTIFACT_CACHE_DIR': os.path.join(self.tmp_dir, 'cache'),
+            'SHOW_DOWNLOAD_PROGRESS': False,
+            'RETRY_BASE_DELAY': 0.05,
+            'RETRY_MAX_DELAY': 0.2,
+        }
+        values.update(self.CONFIG)
+        for patcher in (
+            mock.patch.multiple(config, create=True, **values),
+            mock.patch.object(base, 'WINGET_INSTALL_PATH', os.path.join(self.tmp_dir, 'root')),
+            mock.patch.object(base.CircuitBreaker, '_hosts', {}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(base.HttpClient.close_all)
+
+    def start_server(self, files, **kwargs):
+        server = LocalServer(files, **kwargs)
+        self.addCleanup(server.close)
+        return server
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""多下载源：测速选源与下载中途换源（DownloadTask）"""
+import hashlib
+import os
+import socket
+import unittest
+
+from support import IsolatedTestCase
+from tools.base import CircuitBreaker, DownloadTask
+
+DATA = os.urandom(1024 * 1024)
+SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+def _unused_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class DownloadMirrorTest(IsolatedTestCase):
+    CONFIG = {'MIRROR_PROBE_TIMEOUT': 2}
+
+    def setUp(self):
+        super().setUp()
+        self.save_path = os.path.join(self.tmp_dir, 'file.bin')
+
+    def _read_saved(self):
+        with open(self.save_path, 'rb') as f:
+            return f.read()
+
+    def test_picks_fastest_mirror(self):
+        slow = self.start_server({'/file.bin': DATA}, latency=0.3)
+        fast = self.start_server({'/file.bin': DATA})
+        task = DownloadTask([slow.url('/file.bin'), fast.url('/file.bin')], self.save_path,
+                            show_progress=False, expected_sha256=SHA256)
+        task.run()
+
+        self.assertEqual(task.sources[0]['source'], fast.url('/file.bin'))
+        self.assertEqual(self._read_saved(), DATA)
+        # 慢源只收到测速请求，数据全部来自快源
+        self.assertEqual(slow.range_starts('/file.bin'), [0])
+        self.assertGreater(len(fast.range_starts('/file.bin')), 1)
+
+    def test_skips_unreachable_mirror(self):
+        good = self.start_server({'/file.bin': DATA})
+        dead_url = f'http://127.0.0.1:{_unused_port()}/file.bin'
+        task = DownloadTask([dead_url, good.url('/file.bin')], self.save_path,
+                            show_progress=False, expected_sha256=SHA256)
+        task.run()
+
+        self.assertEqual([s['source'] for s in task.sources], [good.url('/file.bin')])
+        self.assertEqual(self._read_saved(), DATA)
+
+    def test_fails_over_mid_download(self):
+        # 首选源响应快，但每个响应只发送 200 KB 就断开
+        flaky = self.start_server({'/file.bin': DATA}, drop_after=200 * 1024)
+        backup = self.start_server({'/file.bin': DATA}, latency=0.1)
+        task = DownloadTask([flaky.url('/file.bin'), backup.url('/file.bin')], self.save_path,
+                            show_progress=False, connections=1, expected_sha256=SHA256)
+        task.run()
+
+        self.assertEqual(task.sources[0]['source'], flaky.url('/file.bin'))
+        self.assertEqual(self._read_saved(), DATA)
+        self.assertEqual(task.sha256, SHA256)
+        # 备用源从断开处续传，而不是从头下载
+        self.assertIn(200 * 1024, backup.range_starts('/file.bin'))
+
+    def test_open_circuit_does_not_block_sole_source(self):
+        server = self.start_server({'/file.bin': DATA})
+        for _ in range(CircuitBreaker._threshold()):
+            CircuitBreaker.record_failure(f'127.0.0.1:{server.port}')
+        task = DownloadTask(server.url('/file.bin'), self.save_path, show_progress=False,
+                            expected_sha256=SHA256)
+        task.run()
+        self.assertEqual(self._read_saved(), DATA)
+
+    def test_wrong_digest_is_rejected(self):
+        server = self.start_server({'/file.bin': DATA})
+        task = DownloadTask(server.url('/file.bin'), self.save_path, show_progress=False,
+                            expected_sha256='0' * 64)
+        with self.assertRaises(IOError):
+            task.run()
+        self.assertFalse(os.path.exists(self.save_path))
+        self.assertFalse(os.path.exists(task.part_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""局域网缓存共享：两个独立进程在回环地址上互相发现（PeerCacheUtils）
+
+两个进程都按默认流程启动共享服务、监听同一个 UDP 端口，查询方只接受内容与可信 SHA-256 一致的对端。
+"""
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import unittest
+
+from support import IsolatedTestCase
+
+DATA = os.urandom(256 * 1024)
+SHA256 = hashlib.sha256(DATA).hexdigest()
+ORIGIN_PATH = '/toolchain.zip'
+PEER_PROCESS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'peer_process.py')
+
+
+def _unused_udp_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class PeerCacheTest(IsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.origin = self.start_server({ORIGIN_PATH: DATA})
+        self.origin_url = self.origin.url(ORIGIN_PATH)
+        self.port = _unused_udp_port()
+
+    def start_peer(self, content):
+        """启动缓存了 content（声称其 SHA-256 为 SHA256）的对端进程"""
+        work_dir = os.path.join(self.tmp_dir, 'server')
+        os.makedirs(work_dir)
+        file_path = os.path.join(work_dir, 'toolchain.zip')
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        proc = subprocess.Popen(
+            [sys.executable, PEER_PROCESS, 'serve', work_dir, str(self.port), self.origin_url, file_path, SHA256],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+
+        def _stop():
+            proc.stdin.close()
+            proc.wait(10)
+            proc.stdout.close()
+        self.addCleanup(_stop)
+        self.assertEqual(proc.stdout.readline().strip(), 'ready')
+
+    def fetch(self):
+        """在另一个进程中查询并下载，返回其结果与下载的内容"""
+        work_dir = os.path.join(self.tmp_dir, 'client')
+        save_path = os.path.join(work_dir, 'toolchain.zip')
+        output = subprocess.run(
+            [sys.executable, PEER_PROCESS, 'fetch', work_dir, str(self.port), self.origin_url, SHA256, save_path],
+            stdout=subprocess.PIPE, text=True, timeout=60, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        with open(save_path, 'rb') as f:
+            return result, f.read()
+
+    def test_client_that_also_serves_finds_peer(self):
+        self.start_peer(DATA)
+        result, content = self.fetch()
+
+        self.assertTrue(result['serving'])
+        self.assertIsNone(result['peer_without_digest'])
+        self.assertEqual(result['peer']['sha256'], SHA256)
+        self.assertTrue(result['downloaded'])
+        self.assertEqual(content, DATA)
+        # 文件来自对端，没有访问互联网上的地址
+        self.assertEqual(self.origin.requests, [])
+
+    def test_tampered_peer_content_falls_back_to_origin(self):
+        # 对端按正确的 SHA-256 应答，实际提供的却是其他内容
+        self.start_peer(os.urandom(len(DATA)))
+        result, content = self.fetch()
+
+        self.assertEqual(result['peer']['sha256'], SHA256)
+        self.assertTrue(result['downloaded'])
+        self.assertEqual(content, DATA)
+        self.assertTrue(self.origin.requests)
+
+    def test_no_peer_downloads_from_origin(self):
+        result, content = self.fetch()
+
+        self.assertIsNone(result['peer'])
+        self.assertTrue(result['downloaded'])
+        self.assertEqual(content, DATA)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""边下载边计算 SHA-256：分段乱序到达（_StreamHasher）"""
+import hashlib
+import os
+import random
+import unittest
+
+from support import IsolatedTestCase
+from tools.base import _StreamHasher
+
+DATA = os.urandom(3 * 1024 * 1024 + 123)
+SHA256 = hashlib.sha256(DATA).hexdigest()
+CHUNK = 64 * 1024
+
+
+def _interleaved_writes(segments):
+    """模拟多个连接交错写入：第一个分段最慢，最后才送达"""
+    size = len(DATA) // segments
+    queues = []
+    for i in range(segments):
+        start = i * size
+        end = len(DATA) if i == segments - 1 else start + size
+        queues.append([(pos, DATA[pos:min(pos + CHUNK, end)]) for pos in range(start, end, CHUNK)])
+    first = queues.pop(0)
+    rng = random.Random(1)
+    writes = []
+    while any(queues):
+        queue = rng.choice([q for q in queues if q])
+        writes.append(queue.pop(0))
+    return writes + first
+
+
+class StreamHasherTest(IsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.part_path = os.path.join(self.tmp_dir, 'file.part')
+        with open(self.part_path, 'wb') as f:
+            f.write(DATA)
+
+    def _hash(self, buffer_limit, path=None):
+        hasher = _StreamHasher(path or self.part_path, buffer_limit)
+        for pos, data in _interleaved_writes(4):
+            hasher.update(pos, data)
+        return hasher.hexdigest()
+
+    def test_out_of_order_segments_hashed_from_memory(self):
+        # 暂存足够时不读回文件：文件不存在也能得到正确结果
+        missing = os.path.join(self.tmp_dir, 'missing.part')
+        self.assertEqual(self._hash(len(DATA), missing), SHA256)
+
+    def test_overflow_is_read_back_from_file(self):
+        self.assertEqual(self._hash(512 * 1024), SHA256)
+        self.assertEqual(self._hash(0), SHA256)
+
+    def test_resumed_ranges_are_read_back(self):
+        hasher = _StreamHasher(self.part_path, len(DATA))
+        half = len(DATA) // 2
+        hasher.mark_written(0, 1000)
+        hasher.mark_written(half, half + 5000)
+        for pos in range(1000, half, CHUNK):
+            hasher.update(pos, DATA[pos:min(pos + CHUNK, half)])
+        for pos in range(half + 5000, len(DATA), CHUNK):
+            hasher.update(pos, DATA[pos:pos + CHUNK])
+        self.assertEqual(hasher.hexdigest(), SHA256)
+
+
+if __name__ == '__main__':
+    unittest.main()
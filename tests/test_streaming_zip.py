@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""边下载边解压（StreamingZipTask）与硬链接暂存目录（StagedInstall）"""
+import io
+import os
+import unittest
+import zipfile
+
+from support import IsolatedTestCase
+from tools.base import StagedInstall, StreamingZipTask
+
+
+class _Unseekable(io.RawIOBase):
+    """不可 seek 的输出：zipfile 写入时会为每个成员加上数据描述符（标志位 0x08）"""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+def _streamed_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(_Unseekable(buffer), 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+class StreamingZipTest(IsolatedTestCase):
+
+    def test_data_descriptor_member_does_not_write_through_hard_link(self):
+        data = _streamed_zip({'tool/bin/gcc.exe': b'NEWNEWNEW'})
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            self.assertTrue(zf.getinfo('tool/bin/gcc.exe').flag_bits & 0x08)
+        server = self.start_server({'/tool.zip': data})
+
+        live_dir = os.path.join(self.tmp_dir, 'store', '1.0')
+        live_file = os.path.join(live_dir, 'tool', 'bin', 'gcc.exe')
+        os.makedirs(os.path.dirname(live_file))
+        with open(live_file, 'wb') as f:
+            f.write(b'OLD')
+
+        staging = StagedInstall(live_dir)
+        stage_dir = staging.begin(seed=['tool'])
+        stage_file = os.path.join(stage_dir, 'tool', 'bin', 'gcc.exe')
+        self.assertTrue(os.path.samefile(stage_file, live_file))
+
+        StreamingZipTask(server.url('/tool.zip'), stage_dir, show_progress=False).run()
+
+        with open(stage_file, 'rb') as f:
+            self.assertEqual(f.read(), b'NEWNEWNEW')
+        with open(live_file, 'rb') as f:
+            self.assertEqual(f.read(), b'OLD')
+
+
+if __name__ == '__main__':
+    unittest.main()
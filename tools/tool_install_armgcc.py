@@ -1,16 +1,14 @@
 # -*- coding: utf-8 -*-
 from .base import BaseTool
-from .base import PrintUtils, CmdTask, FileUtils, EnvUtils, check_admin
-from .base import osversion, osarch
+from .base import PrintUtils, FileUtils, EnvUtils, GitHubUtils, RemoteZipTask, StreamingZipTask, StagedInstall, JunctionUtils, BundleUtils, PrefetchQueue, ZipExtractTask, CacheUtils, TrashUtils, DiskSpaceUtils
 import os
 import sys
 import json
+import hashlib
+import http.client
 import re
 import zipfile
-import shutil
 import subprocess
-import urllib.request
-import urllib.error
 
 class Tool(BaseTool):
     def __init__(self):
@@ -176,41 +174,36 @@ class Tool(BaseTool):
         try:
             PrintUtils.print_info("正在从 GitHub 获取最新版本信息...")
             
-            # 创建请求
-            req = urllib.request.Request(self.github_api_url)
-            req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)')
+            # 缓存有效期内不联网；过期后条件请求，离线时使用上次获取的信息
+            data = GitHubUtils.get_json(self.github_api_url, timeout=10)
             
-            # 发送请求
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                
-                # 获取 release notes
-                body = data.get('body', '')
-                tag_name = data.get('tag_name', '')
-                
-                PrintUtils.print_info(f"GitHub Release: {tag_name}")
-                
-                # 尝试从 release notes 中解析版本号
-                # 格式可能是: "Add `15.2.Rel1`" 或 "15.2.Rel1" 等
-                # 匹配类似 15.2.Rel1, 14.3.Rel1, 12.3.Rel1 等格式
-                version_patterns = [
-                    r'`?(\d+\.\d+\.Rel\d+)`?',  # 匹配 `15.2.Rel1` 或 15.2.Rel1
-                    r'(\d+\.\d+\.Rel\d+)',      # 匹配 15.2.Rel1
-                    r'(\d+\.\d+-\d{4}-q\d)',    # 匹配旧格式如 10-2020-q4
-                ]
-                
-                for pattern in version_patterns:
-                    match = re.search(pattern, body, re.IGNORECASE)
-                    if match:
-                        version = match.group(1)
-                        PrintUtils.print_success(f"解析到工具链版本: {version}")
-                        return version
-                
-                # 如果无法从 body 中解析，尝试从 tag_name 或其他字段获取
-                PrintUtils.print_warning("无法从 release notes 中解析版本号")
-                return None
+            # 获取 release notes
+            body = data.get('body', '')
+            tag_name = data.get('tag_name', '')
+            
+            PrintUtils.print_info(f"GitHub Release: {tag_name}")
+            
+            # 尝试从 release notes 中解析版本号
+            # 格式可能是: "Add `15.2.Rel1`" 或 "15.2.Rel1" 等
+            # 匹配类似 15.2.Rel1, 14.3.Rel1, 12.3.Rel1 等格式
+            version_patterns = [
+                r'`?(\d+\.\d+\.Rel\d+)`?',  # 匹配 `15.2.Rel1` 或 15.2.Rel1
+                r'(\d+\.\d+\.Rel\d+)',      # 匹配 15.2.Rel1
+                r'(\d+\.\d+-\d{4}-q\d)',    # 匹配旧格式如 10-2020-q4
+            ]
+            
+            for pattern in version_patterns:
+                match = re.search(pattern, body, re.IGNORECASE)
+                if match:
+                    version = match.group(1)
+                    PrintUtils.print_success(f"解析到工具链版本: {version}")
+                    return version
+            
+            # 如果无法从 body 中解析，尝试从 tag_name 或其他字段获取
+            PrintUtils.print_warning("无法从 release notes 中解析版本号")
+            return None
                 
-        except urllib.error.URLError as e:
+        except (OSError, http.client.HTTPException) as e:
             PrintUtils.print_warning(f"无法连接到 GitHub API: {e}")
             return None
         except json.JSONDecodeError as e:
@@ -236,6 +229,75 @@ class Tool(BaseTool):
         url = f'{base_url}/{version}/binrel/{filename}'
         return url
 
+    def is_selective_install_enabled(self):
+        """是否启用按需安装（config.ARM_GCC_SELECTIVE_INSTALL）"""
+        try:
+            import config
+            return bool(getattr(config, 'ARM_GCC_SELECTIVE_INSTALL', False))
+        except Exception:
+            return False
+
+    def is_streaming_install_enabled(self):
+        """是否启用边下载边解压（config.ARM_GCC_STREAMING_INSTALL）"""
+        try:
+            import config
+            return bool(getattr(config, 'ARM_GCC_STREAMING_INSTALL', True))
+        except Exception:
+            return True
+
+    def get_download_urls(self, version):
+        """返回官方地址及配置的镜像地址（官方地址在前，用作缓存键与校验文件来源）
+
+        Args:
+            version: 工具链版本号
+
+        Returns:
+            list: 候选下载地址
+        """
+        urls = [self.get_download_url(version)]
+        mirrors = []
+        try:
+            import config
+            mirrors = getattr(config, 'ARM_GCC_MIRRORS', []) or []
+        except Exception:
+            pass
+        filename = f'arm-gnu-toolchain-{version}-mingw-w64-i686-arm-none-eabi.zip'
+        for mirror in mirrors:
+            urls.append(f"{mirror.rstrip('/')}/{version}/binrel/{filename}")
+        return urls
+
+    def get_artifacts(self):
+        """离线安装包需要的文件：最新版本的工具链压缩包"""
+        version = self.get_latest_version_from_github() or self.fallback_version
+        download_url = self.get_download_url(version)
+        return [{
+            'id': 'armgcc',
+            'urls': self.get_download_urls(version),
+            'filename': f'arm-gnu-toolchain-{version}-mingw-w64-i686-arm-none-eabi.zip',
+            'version': version,
+            'sha256_url': download_url + '.sha256asc',
+        }]
+
+    def get_prefetch_artifacts(self):
+        """后台预取完整压缩包
+
+        按需安装只下载部分文件；边下载边解压时前台会等待预取（持有同一个下载锁）下载完整个文件后
+        才开始解压，下载与解压重新变成先后进行，因此这两种方式都不预取。
+        """
+        if self.is_selective_install_enabled() or self.is_streaming_install_enabled():
+            return []
+        return self.get_artifacts()
+
+    def get_install_space_plan(self, version):
+        """安装指定版本所需的空间：工具链解压后的大小，以及完整压缩包与下载缓存（见 DiskSpaceUtils）"""
+        info = DiskSpaceUtils.artifact_info(self.get_download_urls(version), unpacked=True)
+        store_dir = self.get_store_dir()
+        label = f"工具链 {version}{'（估算）' if info['estimated'] else ''}"
+        plan = [{'path': store_dir, 'size': info['unpacked_size'], 'label': label}]
+        # 边下载边解压时压缩包不落地，否则完整压缩包先保存在暂存目录旁
+        save_dir = None if self.is_streaming_install_enabled() else store_dir
+        return plan + DiskSpaceUtils.download_plan(info, save_dir, '压缩包')
+
     def download_toolchain(self, version, target_dir):
         """下载工具链 zip 文件
         
@@ -254,13 +316,14 @@ class Tool(BaseTool):
             download_url = self.get_download_url(version)
             PrintUtils.print_info(f"下载 URL: {download_url}")
             
-            # 临时文件路径
-            temp_dir = os.environ.get('TEMP', '.')
+            # 压缩包保存在目标目录（与安装目录同一个卷），解压时不需要跨卷读取
             zip_filename = f'arm-gnu-toolchain-{version}-mingw-w64-i686-arm-none-eabi.zip'
-            zip_path = os.path.join(temp_dir, zip_filename)
+            zip_path = os.path.join(target_dir, zip_filename)
             
-            # 下载文件
-            if not FileUtils.download(download_url, zip_path):
+            # 下载文件（Arm 在 zip 旁提供 .sha256asc 校验文件，下载时同步校验）
+            # 配置了镜像时多源测速下载，校验值始终取自官方地址
+            download_urls = self.get_download_urls(version)
+            if not FileUtils.download(download_urls, zip_path, sha256_url=download_url + '.sha256asc'):
                 return None
             
             return zip_path
@@ -269,51 +332,118 @@ class Tool(BaseTool):
             PrintUtils.print_error(f"下载工具链时发生错误: {e}")
             return None
 
-    def extract_toolchain(self, zip_path, target_dir):
+    def install_selective(self, version, dest_dir):
+        """按需安装：只下载并解压包含/排除规则选中的文件
+
+        Args:
+            version: 工具链版本号
+            dest_dir: 解压目录
+
+        Returns:
+            str: 解压后的工具链目录路径，如果失败返回 None
+        """
+        include = []
+        exclude = []
+        try:
+            import config
+            include = getattr(config, 'ARM_GCC_INCLUDE_PATTERNS', []) or []
+            exclude = getattr(config, 'ARM_GCC_EXCLUDE_PATTERNS', []) or []
+        except Exception:
+            pass
+
+        PrintUtils.print_info(f"正在按需安装到: {dest_dir}")
+        try:
+            members = RemoteZipTask(self.get_download_urls(version), dest_dir,
+                                    include=include, exclude=exclude).run()
+        except Exception as e:
+            PrintUtils.print_warning(f"按需安装失败: {e}")
+            return None
+
+        root_dir = next((name.split('/')[0] for name in members if '/' in name), None)
+        if not root_dir:
+            PrintUtils.print_error("无法确定压缩包的根目录")
+            return None
+        extracted_path = os.path.join(dest_dir, root_dir)
+        PrintUtils.print_success(f"按需安装完成: {extracted_path}")
+        return extracted_path
+
+    def install_streaming(self, version, dest_dir):
+        """边下载边解压工具链，不在临时目录保存完整压缩包
+
+        Args:
+            version: 工具链版本号
+            dest_dir: 解压目录
+
+        Returns:
+            str: 解压后的工具链目录路径，如果失败返回 None
+        """
+        download_url = self.get_download_url(version)
+        PrintUtils.print_info(f"下载 URL: {download_url}")
+        sha256 = FileUtils.fetch_expected_sha256(download_url + '.sha256asc')
+        if sha256:
+            PrintUtils.print_info(f"期望 SHA-256: {sha256}")
+
+        PrintUtils.print_info(f"正在边下载边解压到: {dest_dir}")
+        try:
+            members = StreamingZipTask(self.get_download_urls(version), dest_dir, expected_sha256=sha256,
+                                       manifest_path=self.get_extract_manifest(dest_dir),
+                                       link_from=self.get_link_sources()).run()
+        except Exception as e:
+            PrintUtils.print_warning(f"边下载边解压失败: {e}")
+            return None
+
+        root_dir = next((name.split('/')[0] for name in members if '/' in name), None)
+        if not root_dir:
+            PrintUtils.print_error("无法确定压缩包的根目录")
+            return None
+        if sha256:
+            PrintUtils.print_success("SHA-256 校验通过")
+        extracted_path = os.path.join(dest_dir, root_dir)
+        PrintUtils.print_success(f"安装完成: {extracted_path}")
+        return extracted_path
+
+    def get_zip_root_dir(self, zip_path):
+        """返回压缩包的根目录名（通常是第一个目录），无法确定时返回 None"""
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            for name in zip_ref.namelist():
+                if '/' in name:
+                    return name.split('/')[0]
+                elif '\\' in name:
+                    return name.split('\\')[0]
+        return None
+
+    def extract_toolchain(self, zip_path, dest_dir):
         """使用 zipfile 模块解压工具链到目标目录
         
         Args:
             zip_path: zip 文件路径
-            target_dir: 目标目录（D:\CodeTools\Compiler）
+            dest_dir: 解压目录（D:\\CodeTools\\Compiler\\arm-none-eabi-gcc\\<版本>）
             
         Returns:
             str: 解压后的工具链目录路径，如果失败返回 None
         """
         try:
-            # 创建 arm-none-eabi-gcc 子目录
-            armgcc_dir = os.path.join(target_dir, 'arm-none-eabi-gcc')
+            armgcc_dir = dest_dir
             PrintUtils.print_info(f"正在解压到: {armgcc_dir}")
             
             # 确保目标目录存在
             os.makedirs(armgcc_dir, exist_ok=True)
             
-            # 打开 zip 文件
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                # 获取所有文件列表
-                file_list = zip_ref.namelist()
-                
-                # 查找根目录（通常是第一个目录）
-                root_dir = None
-                for name in file_list:
-                    if '/' in name:
-                        root_dir = name.split('/')[0]
-                        break
-                    elif '\\' in name:
-                        root_dir = name.split('\\')[0]
-                        break
-                
-                if not root_dir:
-                    PrintUtils.print_error("无法确定压缩包的根目录")
-                    return None
-                
-                # 解压所有文件到 arm-none-eabi-gcc 目录
-                zip_ref.extractall(armgcc_dir)
-                
-                # 返回解压后的完整路径
-                extracted_path = os.path.join(armgcc_dir, root_dir)
-                PrintUtils.print_success(f"解压完成: {extracted_path}")
-                
-                return extracted_path
+            root_dir = self.get_zip_root_dir(zip_path)
+            if not root_dir:
+                PrintUtils.print_error("无法确定压缩包的根目录")
+                return None
+
+            # 解压所有文件到版本目录；同版本重装时只写入缺失或变化的文件，
+            # 与其他已安装版本相同的文件直接硬链接
+            FileUtils.extract_zip(zip_path, armgcc_dir, manifest_path=self.get_extract_manifest(armgcc_dir),
+                                  link_from=self.get_link_sources())
+            
+            # 返回解压后的完整路径
+            extracted_path = os.path.join(armgcc_dir, root_dir)
+            PrintUtils.print_success(f"解压完成: {extracted_path}")
+            
+            return extracted_path
                 
         except zipfile.BadZipFile:
             PrintUtils.print_error("无效的 zip 文件")
@@ -361,9 +491,234 @@ class Tool(BaseTool):
                 return root
         return None
 
+    def get_store_dir(self):
+        """多版本存放目录: <安装目录>\\arm-none-eabi-gcc\\<版本>，current 指向正在使用的版本"""
+        return os.path.join(self.install_dir, 'arm-none-eabi-gcc')
+
+    def get_current_link(self):
+        return os.path.join(self.get_store_dir(), 'current')
+
+    def get_current_bin_path(self):
+        """PATH 与 MSYS2 配置中使用的固定路径，切换版本时不需要修改"""
+        return os.path.join(self.get_current_link(), 'bin')
+
+    def get_extract_manifest(self, version_dir):
+        """版本目录中的解压清单（见 ZipExtractTask）"""
+        return os.path.join(version_dir, '.extract-manifest.json')
+
+    def get_link_sources(self):
+        """已安装版本的解压清单 [(清单路径, 版本目录)]，安装新版本时内容相同的文件硬链接到这些目录中的文件"""
+        store_dir = self.get_store_dir()
+        sources = []
+        for version, _ in self.list_installed_versions():
+            version_dir = os.path.join(store_dir, version)
+            manifest_path = self.get_extract_manifest(version_dir)
+            if os.path.isfile(manifest_path):
+                sources.append((manifest_path, version_dir))
+        return sources
+
+    def get_install_manifest(self, version_dir):
+        """版本目录中的安装清单：版本、bin 目录、文件数与内容哈希"""
+        return os.path.join(version_dir, '.install.json')
+
+    def write_install_manifest(self, version, version_dir, toolchain_dir):
+        """安装完成后写入安装清单，之后检测安装状态只需读取该文件并检查一次 gcc
+
+        Args:
+            version: 工具链版本号
+            version_dir: 版本目录（可以是尚未切换的暂存目录，清单中只记录相对路径）
+            toolchain_dir: 工具链根目录
+        """
+        bin_path = self.find_armgcc_bin_path(toolchain_dir)
+        if not bin_path:
+            return False
+        # 内容哈希按文件名与各文件的 SHA-256 计算；解压清单中有 SHA-256 时直接使用，不再读取文件
+        files = ZipExtractTask.load_manifest(self.get_extract_manifest(version_dir))
+        if files and all(entry.get('sha256') for entry in files.values()):
+            digests = {name: entry['sha256'] for name, entry in files.items()}
+        else:
+            digests = {}
+            for root, _, names in os.walk(toolchain_dir):
+                for name in names:
+                    path = os.path.join(root, name)
+                    rel = os.path.relpath(path, version_dir).replace(os.sep, '/')
+                    digests[rel] = CacheUtils.file_sha256(path)
+        hasher = hashlib.sha256()
+        for name in sorted(digests):
+            hasher.update(f"{name}\0{digests[name]}\n".encode('utf-8'))
+
+        gcc_stat = os.stat(os.path.join(bin_path, 'arm-none-eabi-gcc.exe'))
+        manifest = {
+            'format': 1,
+            'version': version,
+            'bin': os.path.relpath(bin_path, version_dir).replace(os.sep, '/'),
+            'gcc_size': gcc_stat.st_size,
+            'gcc_mtime_ns': gcc_stat.st_mtime_ns,
+            'file_count': len(digests),
+            'sha256': hasher.hexdigest(),
+        }
+        manifest_path = self.get_install_manifest(version_dir)
+        try:
+            # 暂存目录中的旧清单可能是正式目录的硬链接，写入临时文件后替换
+            with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=1)
+            os.replace(manifest_path + '.tmp', manifest_path)
+        except OSError as e:
+            PrintUtils.print_warning(f"写入安装清单失败: {e}")
+            return False
+        return True
+
+    def read_install_manifest(self, version_dir):
+        """读取安装清单并检查 gcc 是否仍是安装时的文件
+
+        Returns:
+            str: bin 目录路径，清单不存在、格式不对或已过期时返回 None
+        """
+        try:
+            with open(self.get_install_manifest(version_dir), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            bin_path = os.path.join(version_dir, *manifest['bin'].split('/'))
+            gcc_stat = os.stat(os.path.join(bin_path, 'arm-none-eabi-gcc.exe'))
+        except (OSError, ValueError, KeyError, AttributeError, TypeError):
+            return None
+        if (manifest.get('format') != 1 or manifest.get('version') != os.path.basename(version_dir)
+                or gcc_stat.st_size != manifest.get('gcc_size')
+                or gcc_stat.st_mtime_ns != manifest.get('gcc_mtime_ns')):
+            return None
+        return bin_path
+
+    def get_stage_seed(self, version):
+        """同版本重装时用硬链接预先填入暂存目录的内容（版本目录中的所有条目，见 StagedInstall.begin）"""
+        try:
+            return os.listdir(os.path.join(self.get_store_dir(), version))
+        except OSError:
+            return None
+
+    def get_staged_install(self, version):
+        """指定版本目录的暂存安装（见 StagedInstall）"""
+        return StagedInstall(os.path.join(self.get_store_dir(), version))
+
+    def list_installed_versions(self):
+        """返回已安装的版本 [(版本, 工具链目录)]（旧布局直接放在存放目录下的工具链也会列出）"""
+        store_dir = self.get_store_dir()
+        if not os.path.isdir(store_dir):
+            return []
+        versions = []
+        for name in sorted(os.listdir(store_dir)):
+            path = os.path.join(store_dir, name)
+            if name.startswith('.') or not os.path.isdir(path) or JunctionUtils.read(path):
+                continue
+            bin_path = self.read_install_manifest(path) or self.find_armgcc_bin_path(path)
+            if bin_path:
+                versions.append((name, os.path.dirname(bin_path)))
+        return versions
+
+    def get_current_version(self):
+        """返回 current 指向的版本，没有时返回 None"""
+        target = JunctionUtils.read(self.get_current_link())
+        if not target:
+            return None
+        rel = os.path.relpath(target, self.get_store_dir())
+        return rel.split(os.sep)[0] if not rel.startswith('..') else None
+
+    def recover_interrupted(self):
+        """恢复上次在目录切换中途中断的安装（见 StagedInstall.recover）"""
+        store_dir = self.get_store_dir()
+        if not os.path.isdir(store_dir):
+            return
+        for name in os.listdir(store_dir):
+            if name.startswith('.') and name.endswith('.prev'):
+                self.get_staged_install(name[1:-len('.prev')]).recover()
+
+    def switch_version(self, version, toolchain_dir):
+        """把 current 指向指定版本：只改目录联接，不下载、不解压、不修改注册表"""
+        try:
+            JunctionUtils.switch(self.get_current_link(), toolchain_dir)
+        except OSError as e:
+            PrintUtils.print_error(f"切换版本失败: {e}")
+            return False
+        PrintUtils.print_success(f"当前使用的版本: {version}（{toolchain_dir}）")
+        return True
+
+    def ensure_env_points_to_current(self, stale_bin_paths=()):
+        """让 PATH 与 MSYS2 配置指向 current\\bin（已指向时不做任何修改）
+
+        Args:
+            stale_bin_paths: 需要从 PATH 移除的旧 bin 目录（旧版本直接写入 PATH 的路径）
+        """
+        current_bin = os.path.abspath(self.get_current_bin_path())
+        stale = [os.path.abspath(p) for p in stale_bin_paths
+                 if p and EnvUtils._normalize_path_for_compare(p) != EnvUtils._normalize_path_for_compare(current_bin)]
+        if stale:
+            PrintUtils.print_info("正在从 PATH 移除旧的 bin 目录（之后切换版本不再修改 PATH）:")
+            for p in stale:
+                PrintUtils.print_info(f"  {p}")
+            EnvUtils.remove_from_path_environment(stale, prefer_system=True)
+
+        if EnvUtils.is_in_path(current_bin):
+            PrintUtils.print_info(f"PATH 已包含 {current_bin}，无需修改")
+        else:
+            PrintUtils.print_info(f"正在添加以下路径到系统 PATH 环境变量:")
+            PrintUtils.print_info(f"  {current_bin}")
+            if EnvUtils.add_to_system_path([current_bin], skip_if_not_admin=True):
+                PrintUtils.print_success("已添加到 PATH 环境变量")
+            else:
+                PrintUtils.print_warning("添加到 PATH 环境变量失败，请手动添加")
+                PrintUtils.print_info(f"请手动将以下路径添加到 PATH: {current_bin}")
+
+        PrintUtils.print_info("")
+        msys2_path = self.get_msys2_path()
+        if msys2_path:
+            profile_file = self.get_msys2_profile_file(msys2_path)
+            try:
+                with open(profile_file, 'r', encoding='utf-8') as f:
+                    configured = self.to_msys2_unix_path(current_bin) in f.read()
+            except OSError:
+                configured = False
+            if configured:
+                PrintUtils.print_info(f"MSYS2 配置已指向 {current_bin}，无需修改")
+                return
+        self.configure_msys2_armgcc_path(current_bin)
+
+    def choose_version(self):
+        """切换已安装的版本，或回滚当前版本到上一次安装"""
+        versions = self.list_installed_versions()
+        current = self.get_current_version()
+        options = []
+        for version, toolchain_dir in versions:
+            mark = "（当前）" if version == current else ""
+            options.append((f"切换到 {version}{mark}", version, toolchain_dir))
+        if current and self.get_staged_install(current).has_previous():
+            options.append((f"回滚 {current} 到上一次安装", None, None))
+
+        PrintUtils.print_info("请选择:")
+        for i, (label, _, _) in enumerate(options, 1):
+            PrintUtils.print_info(f"  {i}. {label}")
+        PrintUtils.print_info("  0. 返回")
+        op = input("请选择: ").strip()
+        if not op.isdigit() or not 1 <= int(op) <= len(options):
+            return False
+        label, version, toolchain_dir = options[int(op) - 1]
+        if version is None:
+            if not self.get_staged_install(current).rollback():
+                return False
+            bin_path = self.find_armgcc_bin_path(os.path.join(self.get_store_dir(), current))
+            if not bin_path:
+                PrintUtils.print_error("回滚后未找到 bin 目录")
+                return False
+            version, toolchain_dir = current, os.path.dirname(bin_path)
+        return self.switch_version(version, toolchain_dir)
+
     def check_installed(self):
-        """检查是否已安装（目录扫描 + PATH 全局检测）"""
-        armgcc_dir = os.path.join(self.install_dir, 'arm-none-eabi-gcc')
+        """检查是否已安装（安装清单 + 目录扫描 + PATH 全局检测）"""
+        current_bin = self.get_current_bin_path()
+        # 安装清单有效时只需读取清单并检查一次 gcc，不扫描目录、不启动 where
+        target = JunctionUtils.read(self.get_current_link())
+        if target and self.read_install_manifest(os.path.dirname(target)):
+            return True, current_bin, "local"
+        if os.path.exists(os.path.join(current_bin, 'arm-none-eabi-gcc.exe')):
+            return True, current_bin, "local"
+        armgcc_dir = self.get_store_dir()
         if os.path.exists(armgcc_dir):
             bin_path = self.find_armgcc_bin_path(armgcc_dir)
             if bin_path:
@@ -415,11 +770,12 @@ class Tool(BaseTool):
             PrintUtils.print_success("ARM GCC 卸载清理完成!")
             return True
 
-        armgcc_dir = os.path.join(self.install_dir, 'arm-none-eabi-gcc')
+        # 所有版本、current 联接以及暂存与回滚目录都在存放目录中，一并移入回收目录后在后台删除
+        armgcc_dir = self.get_store_dir()
         if os.path.exists(armgcc_dir):
             try:
-                shutil.rmtree(armgcc_dir, ignore_errors=False)
-                PrintUtils.print_success(f"已删除安装目录: {armgcc_dir}")
+                TrashUtils.move_to_trash(armgcc_dir)
+                PrintUtils.print_success(f"已删除安装目录: {armgcc_dir}（文件在后台清理，可以继续使用）")
             except Exception as e:
                 PrintUtils.print_error(f"删除安装目录失败: {e}")
                 PrintUtils.print_warning("你可以稍后手动删除该目录（可能被占用）")
@@ -438,21 +794,38 @@ class Tool(BaseTool):
         PrintUtils.print_info("=" * 60)
         PrintUtils.print_info("")
 
-        # 检查是否已安装
+        # 检查是否已安装（先恢复上次中断的目录切换）
+        self.recover_interrupted()
         is_installed, bin_path, install_source = self.check_installed()
+        # 旧版本直接写入 PATH 的 bin 目录，改为指向 current 后移除
+        stale_bin_paths = [bin_path] if is_installed and install_source == "local" else []
         if is_installed:
             source_text = "本工具安装目录" if install_source == "local" else "系统 PATH(外部安装)"
             PrintUtils.print_success(f"检测到 ARM GCC 工具链已安装在: {bin_path}")
             PrintUtils.print_info(f"检测来源: {source_text}")
             PrintUtils.print_info("")
             PrintUtils.print_info("请选择操作:")
-            PrintUtils.print_info("  1. 重新安装")
+            PrintUtils.print_info("  1. 重新安装（或安装最新版本）")
             if install_source == "local":
                 PrintUtils.print_info("  2. 卸载（清理 PATH + 删除安装目录）")
             else:
                 PrintUtils.print_info("  2. 卸载（仅清理 PATH，不删除外部安装目录）")
             PrintUtils.print_info("  3. 退出")
-            op = input("请选择 [1/2/3]: ").strip()
+            current = self.get_current_version()
+            can_switch = install_source == "local" and (
+                len(self.list_installed_versions()) > 1
+                or (current and self.get_staged_install(current).has_previous())
+            )
+            if can_switch:
+                PrintUtils.print_info("  4. 切换已安装的版本 / 回滚")
+            op = input("请选择 [1/2/3/4]: " if can_switch else "请选择 [1/2/3]: ").strip()
+            if op in ('2', '3', '0', '4'):
+                PrefetchQueue.cancel()
+            if op == '4' and can_switch:
+                if self.choose_version():
+                    PrintUtils.print_info("")
+                    self.ensure_env_points_to_current(stale_bin_paths)
+                return
             if op == '2':
                 # 二次确认
                 if install_source == "local":
@@ -472,71 +845,111 @@ class Tool(BaseTool):
                 # 1 或其他输入，继续走重新安装流程
                 pass
 
-        # 获取最新版本
-        version = self.get_latest_version_from_github()
-        if not version:
-            PrintUtils.print_warning(f"无法从 GitHub 获取版本，使用后备版本: {self.fallback_version}")
-            version = self.fallback_version
+        # 获取最新版本（使用离线安装包时安装包中的版本）
+        artifact = BundleUtils.get_artifact('armgcc')
+        if artifact:
+            version = artifact['version']
+            PrintUtils.print_success(f"将安装离线安装包中的版本: {version}")
         else:
-            PrintUtils.print_success(f"将安装版本: {version}")
+            version = self.get_latest_version_from_github()
+            if not version:
+                PrintUtils.print_warning(f"无法从 GitHub 获取版本，使用后备版本: {self.fallback_version}")
+                version = self.fallback_version
+            else:
+                PrintUtils.print_success(f"将安装版本: {version}")
 
         PrintUtils.print_info("")
 
-        # 下载工具链
-        PrintUtils.print_info("开始下载工具链...")
-        zip_path = self.download_toolchain(version, self.install_dir)
-        if not zip_path:
-            PrintUtils.print_error("下载失败")
+        # 确定版本后、下载之前检查磁盘空间（卸载、切换版本不需要）
+        if not DiskSpaceUtils.confirm(lambda: self.get_install_space_plan(version)):
+            PrintUtils.print_info("已取消安装")
             return
 
-        PrintUtils.print_info("")
+        # 每个版本安装在 arm-none-eabi-gcc\<版本> 中，与其他版本并存；
+        # 先安装到同一个卷上的暂存目录，完整成功后再用重命名切换，同版本的原目录保留用于回滚；
+        # 同版本重装时暂存目录用硬链接预先填入当前安装，解压时只写入变化的文件
+        staging = self.get_staged_install(version)
+        stage_dir = staging.begin(seed=self.get_stage_seed(version))
+
+        # 按需安装（只下载需要的文件）或边下载边解压，失败时改为下载完整压缩包
+        toolchain_dir = None
+        zip_path = None
+        toolchain_attempted = False
+        if self.is_selective_install_enabled() and not BundleUtils.is_offline():
+            PrintUtils.print_info("开始按需安装工具链...")
+            toolchain_attempted = True
+            toolchain_dir = self.install_selective(version, stage_dir)
+            if not toolchain_dir:
+                PrintUtils.print_warning("改为下载完整压缩包")
+            PrintUtils.print_info("")
+
+        if not toolchain_dir and self.is_streaming_install_enabled():
+            PrintUtils.print_info("开始下载并解压工具链...")
+            toolchain_attempted = True
+            toolchain_dir = self.install_streaming(version, stage_dir)
+            if not toolchain_dir:
+                PrintUtils.print_warning("改为下载完整压缩包后再解压")
+            PrintUtils.print_info("")
 
-        # 解压工具链
-        PrintUtils.print_info("开始解压工具链...")
-        toolchain_dir = self.extract_toolchain(zip_path, self.install_dir)
         if not toolchain_dir:
-            PrintUtils.print_error("解压失败")
-            # 清理下载的文件
-            try:
-                if os.path.exists(zip_path):
-                    os.remove(zip_path)
-            except:
-                pass
-            return
+            # 下载工具链（保存在暂存目录旁，与安装目录同一个卷）
+            PrintUtils.print_info("开始下载工具链...")
+            zip_path = self.download_toolchain(version, staging.work_dir)
+            if not zip_path:
+                PrintUtils.print_error("下载失败")
+                staging.cleanup()
+                return
 
-        # 获取 bin 目录路径（兼容多种压缩包目录结构）
-        armgcc_root = os.path.join(self.install_dir, 'arm-none-eabi-gcc')
-        bin_path = self.find_armgcc_bin_path(armgcc_root)
-        
-        # 验证 bin 目录是否存在
-        if not bin_path or not os.path.exists(bin_path):
-            PrintUtils.print_error(f"未找到 bin 目录: {bin_path}")
-            return
+            PrintUtils.print_info("")
 
-        PrintUtils.print_info("")
+            # 解压工具链（前面的安装方式失败时暂存目录中可能有残留，重新准备）
+            PrintUtils.print_info("开始解压工具链...")
+            if toolchain_attempted:
+                staging.begin(seed=self.get_stage_seed(version))
+            toolchain_dir = self.extract_toolchain(zip_path, stage_dir)
+            if not toolchain_dir:
+                PrintUtils.print_error("解压失败")
+                # 清理下载的文件
+                try:
+                    if os.path.exists(zip_path):
+                        os.remove(zip_path)
+                except:
+                    pass
+                staging.cleanup()
+                return
 
-        # 添加到环境变量（只添加这一个路径）
-        bin_path_abs = os.path.abspath(bin_path)
-        PrintUtils.print_info(f"正在添加以下路径到系统 PATH 环境变量:")
-        PrintUtils.print_info(f"  {bin_path_abs}")
-        if EnvUtils.add_to_system_path([bin_path_abs], skip_if_not_admin=True):
-            PrintUtils.print_success("已添加到 PATH 环境变量")
-        else:
-            PrintUtils.print_warning("添加到 PATH 环境变量失败，请手动添加")
-            PrintUtils.print_info(f"请手动将以下路径添加到 PATH: {bin_path}")
+        # 暂存目录中确认工具链完整后再切换
+        if not self.find_armgcc_bin_path(stage_dir):
+            PrintUtils.print_error("安装结果中未找到 arm-none-eabi-gcc.exe，已保留原安装")
+            staging.cleanup()
+            return
+        self.write_install_manifest(version, stage_dir, toolchain_dir)
+        if not staging.commit():
+            staging.cleanup()
+            return
+        toolchain_dir = os.path.join(staging.target_dir, os.path.relpath(toolchain_dir, stage_dir))
+
+        # current 指向新版本；PATH 与 MSYS2 配置只指向 current，以后切换版本不再修改
+        if not self.switch_version(version, toolchain_dir):
+            staging.cleanup()
+            return
+        if staging.has_previous():
+            PrintUtils.print_info("同版本的上一次安装已保留，可在本工具中选择“切换已安装的版本 / 回滚”")
+        bin_path = self.get_current_bin_path()
 
         PrintUtils.print_info("")
-        self.configure_msys2_armgcc_path(bin_path_abs)
+        self.ensure_env_points_to_current(stale_bin_paths)
 
         PrintUtils.print_info("")
 
         # 清理临时文件
         try:
-            if os.path.exists(zip_path):
+            if zip_path and os.path.exists(zip_path):
                 os.remove(zip_path)
                 PrintUtils.print_info("已清理临时文件")
         except:
             pass
+        staging.cleanup()
 
         # 安装完成
         PrintUtils.print_success("=" * 60)
@@ -551,4 +964,3 @@ class Tool(BaseTool):
         PrintUtils.print_info(f"安装路径: {toolchain_dir}")
         PrintUtils.print_info(f"Bin 目录: {bin_path}")
         PrintUtils.print_success("=" * 60)
-
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 import os
+import subprocess
 
 from .base import BaseTool
-from .base import PrintUtils, WingetUtils, ChooseTask
+from .base import PrintUtils, WingetUtils, ChooseTask, CacheUtils, BundleUtils, DiskSpaceUtils
 
 
 class Tool(BaseTool):
@@ -16,6 +17,57 @@ class Tool(BaseTool):
         base_path = WingetUtils.DEFAULT_INSTALL_PATH or r"D:\CodeTools"
         return os.path.join(base_path, "Git")
 
+    def get_artifacts(self):
+        """离线安装包需要的文件：winget 清单中的 Git 安装程序"""
+        info = WingetUtils.get_installer_info("Git.Git")
+        if not info:
+            PrintUtils.print_warning("无法从 winget 获取 Git 安装程序地址，离线安装包中将不包含 Git")
+            return []
+        return [{
+            "id": "git",
+            "urls": [info["url"]],
+            "filename": info["url"].rsplit("/", 1)[-1] or "Git-installer.exe",
+            "version": info["version"],
+            "sha256": info["sha256"],
+        }]
+
+    def get_space_plan(self):
+        """winget 把安装程序下载到临时目录所需的空间（离线安装包中的安装程序直接从缓存运行）"""
+        artifact = BundleUtils.get_artifact("git")
+        if artifact:
+            urls = [artifact["url"]]
+        else:
+            artifacts = self.get_artifacts()
+            if not artifacts:
+                return []
+            urls = artifacts[0]["urls"]
+        info = DiskSpaceUtils.artifact_info(urls)
+        if info["cached"]:
+            return DiskSpaceUtils.download_plan(info, None, "Git 安装程序")
+        return [{"path": os.environ.get("TEMP", os.getcwd()), "size": info["size"], "label": "Git 安装程序"}]
+
+    def _install_from_bundle(self, git_install_path):
+        """离线模式：静默运行离线安装包中的 Git 安装程序（Inno Setup）。"""
+        artifact = BundleUtils.get_artifact("git")
+        if not artifact:
+            PrintUtils.print_error("离线安装包中没有 Git 安装程序")
+            return False
+        PrintUtils.print_info(f"正在安装离线安装包中的 Git {artifact.get('version') or ''}".rstrip())
+        try:
+            # 从离线安装包解出并校验 SHA-256，失败时抛出 IOError
+            installer_path = CacheUtils.lookup(artifact["url"], sha256=artifact["sha256"])
+            if not installer_path:
+                PrintUtils.print_error("离线安装包中的 Git 安装程序缺失或已损坏")
+                return False
+            result = subprocess.run(
+                [installer_path, "/VERYSILENT", "/NORESTART", "/SP-", f"/DIR={git_install_path}"],
+                timeout=1800
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            PrintUtils.print_error(f"运行 Git 安装程序失败: {e}")
+            return False
+        return result.returncode == 0
+
     def _check_git_installed(self, package_id):
         """检查 Git 是否已安装。"""
         versions = WingetUtils.list_installed_versions(package_id)
@@ -72,11 +124,14 @@ class Tool(BaseTool):
             "注意: Git.Git 是否使用 --location 取决于安装器，实际路径可能回退到默认目录"
         )
 
-        ok = WingetUtils.install(
-            package_id,
-            custom_location=git_install_path,
-            source="winget",
-        )
+        if BundleUtils.is_offline():
+            ok = self._install_from_bundle(git_install_path)
+        else:
+            ok = WingetUtils.install(
+                package_id,
+                custom_location=git_install_path,
+                source="winget",
+            )
         if not ok:
             PrintUtils.print_error("Git for Windows 安装失败")
             PrintUtils.print_warning(
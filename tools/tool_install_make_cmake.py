@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from .base import BaseTool
-from .base import PrintUtils, CmdTask, FileUtils, WingetUtils, ChooseTask, EnvUtils, check_admin
+from .base import PrintUtils, CmdTask, PacmanTask, FileUtils, WingetUtils, ChooseTask, EnvUtils, BundleUtils, check_admin
 from .base import osversion, osarch
 import os
 import sys
@@ -110,6 +110,10 @@ class Tool(BaseTool):
             return True
         return False
 
+    def get_pacman_packages(self):
+        """离线安装包需要的 pacman 包"""
+        return ['gcc', 'make', 'cmake']
+
     def check_package_installed(self, bash_path, package_name):
         """检查包是否已安装
         
@@ -179,14 +183,10 @@ class Tool(BaseTool):
         try:
             PrintUtils.print_info(f"正在安装 {display_name}...")
             
-            result = subprocess.run(
-                [bash_path, '-lc', f'pacman -S {package_name} --noconfirm'],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                timeout=300  # 5分钟超时
-            )
+            # 使用离线安装包时附加安装包中的 pacman 数据库与包
+            msys2_path = os.path.dirname(os.path.dirname(os.path.dirname(bash_path)))
+            pacman_args = BundleUtils.get_pacman_args(msys2_path)
+            result = PacmanTask(bash_path, f'-S {package_name} --noconfirm{pacman_args}', timeout=300).run()  # 5分钟超时
             
             if result.returncode == 0:
                 PrintUtils.print_success(f"{display_name} 安装完成!")
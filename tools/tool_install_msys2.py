@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from .base import BaseTool
-from .base import PrintUtils, CmdTask, FileUtils, WingetUtils, ChooseTask, EnvUtils, check_admin
+from .base import PrintUtils, CmdTask, PacmanTask, FileUtils, WingetUtils, ChooseTask, EnvUtils, BundleUtils, PrefetchQueue, DiskSpaceUtils, check_admin
 from .base import osversion, osarch
 import os
 import sys
@@ -273,15 +273,73 @@ class Tool(BaseTool):
                 PrintUtils.print_warning("提示: 如果检测到多个版本，请使用选项 1 卸载所有版本")
                 return False
 
+    def get_installer_urls(self, official_url, installer_name):
+        """返回安装程序的候选下载地址：官方源在前（作为下载缓存的键），其后是按 DEFAULT_MIRROR 排列的国内镜像
+
+        实际使用哪个源由测速结果决定。
+
+        Args:
+            official_url: 官方下载地址
+            installer_name: 安装程序文件名
+
+        Returns:
+            list: 候选下载地址
+        """
+        mirrors = []
+        default_mirror = 'tsinghua'
+        try:
+            import config
+            default_mirror = getattr(config, 'DEFAULT_MIRROR', default_mirror)
+            mirrors = [getattr(config, 'TSINGHUA_MIRROR', {}), getattr(config, 'USTC_MIRROR', {})]
+            if default_mirror == 'ustc':
+                mirrors.reverse()
+        except Exception:
+            pass
+
+        urls = [official_url]
+        if default_mirror != 'official':
+            for mirror in mirrors:
+                base = mirror.get('msys2_distrib')
+                if base:
+                    urls.append(f"{base.rstrip('/')}/x86_64/{installer_name}")
+        return urls
+
+    def get_installer_info(self):
+        """根据架构返回安装程序的官方下载地址与文件名，不支持的架构返回 (None, None)"""
+        if osarch == 'amd64':
+            return "https://repo.msys2.org/distrib/x86_64/msys2-x86_64-latest.exe", "msys2-x86_64-latest.exe"
+        return None, None
+
+    def get_artifacts(self):
+        """离线安装包需要的文件：MSYS2 安装程序"""
+        download_url, installer_name = self.get_installer_info()
+        if not download_url:
+            return []
+        return [{
+            'id': 'msys2',
+            'urls': self.get_installer_urls(download_url, installer_name),
+            'filename': installer_name,
+        }]
+
+    def get_prefetch_artifacts(self):
+        """后台预取安装程序（选择 winget 安装时取消）"""
+        return self.get_artifacts()
+
+    def get_space_plan(self):
+        """安装程序下载到临时目录（以及下载缓存）所需的空间"""
+        download_url, installer_name = self.get_installer_info()
+        if not download_url:
+            return []
+        info = DiskSpaceUtils.artifact_info(self.get_installer_urls(download_url, installer_name))
+        return DiskSpaceUtils.download_plan(info, os.environ.get('TEMP', '.'), 'MSYS2 安装程序')
+
     def install_msys2_manual(self):
         """手动下载安装 MSYS2"""
         PrintUtils.print_info("开始手动下载安装 MSYS2...")
 
         # 根据架构选择下载链接
-        if osarch == 'amd64':
-            download_url = "https://repo.msys2.org/distrib/x86_64/msys2-x86_64-latest.exe"
-            installer_name = "msys2-x86_64-latest.exe"
-        else:
+        download_url, installer_name = self.get_installer_info()
+        if not download_url:
             PrintUtils.print_error(f"不支持的架构: {osarch}")
             return False
 
@@ -289,8 +347,8 @@ class Tool(BaseTool):
         temp_dir = os.environ.get('TEMP', '.')
         installer_path = os.path.join(temp_dir, installer_name)
 
-        # 下载安装程序
-        if not FileUtils.download(download_url, installer_path):
+        # 下载安装程序（镜像与官方源同时测速，下载中途失败或过慢时自动切换）
+        if not FileUtils.download(self.get_installer_urls(download_url, installer_name), installer_path):
             return False
 
         # 运行安装程序
@@ -413,6 +471,10 @@ Server = https://mirrors.ustc.edu.cn/msys2/mingw/x86_64
 
     def update_msys2(self):
         """初始化 MSYS2 环境，更新 pacman 数据库"""
+        if BundleUtils.is_offline():
+            PrintUtils.print_info("离线模式下跳过更新，安装软件包时将使用离线安装包中的 pacman 数据库")
+            return True
+
         msys2_path = self.get_msys2_path()
         if not msys2_path:
             PrintUtils.print_error("未找到 MSYS2 安装目录")
@@ -445,14 +507,7 @@ Server = https://mirrors.ustc.edu.cn/msys2/mingw/x86_64
             
             # 更新 pacman 本身
             PrintUtils.print_info("更新 pacman...")
-            result = subprocess.run(
-                [bash_path, '-lc', 'pacman -S --noconfirm pacman pacman-mirrors msys2-runtime'],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                timeout=300
-            )
+            result = PacmanTask(bash_path, '-S --noconfirm pacman pacman-mirrors msys2-runtime', timeout=300).run()
             
             if result.returncode == 0:
                 PrintUtils.print_success("pacman 更新完成")
@@ -566,7 +621,9 @@ Server = https://mirrors.ustc.edu.cn/msys2/mingw/x86_64
             }
             
             code, result = ChooseTask(options, "MSYS2 已安装，请选择操作:").run()
-            
+            if code != 1:
+                PrefetchQueue.cancel()
+
             if code == 0 or code == 4:
                 PrintUtils.print_info("退出")
                 return
@@ -585,13 +642,19 @@ Server = https://mirrors.ustc.edu.cn/msys2/mingw/x86_64
             # 未安装，直接进入安装流程
             pass
 
-        # 选择安装方式
+        # 选择安装方式（离线模式下只能使用安装包中的安装程序）
         options = {
             1: "使用 winget 安装（推荐，自动化程度高）",
             2: "手动下载安装（适合 winget 不可用的情况）"
         }
 
-        code, result = ChooseTask(options, "请选择安装方式:").run()
+        if BundleUtils.is_offline():
+            PrintUtils.print_info("离线模式：使用离线安装包中的安装程序")
+            code = 2
+        else:
+            code, result = ChooseTask(options, "请选择安装方式:").run()
+            if code != 2:
+                PrefetchQueue.cancel()
 
         if code == 0:
             PrintUtils.print_info("取消安装")